@@ -18,6 +18,18 @@ Usage:
     # Batch inference on folder
     python predict.py --source test_images/ --model results/improved_model/train/weights/best.pt
     
+    # Batch inference with 32 images per forward pass
+    python predict.py --source test_images/ --model results/improved_model/train/weights/best.pt --batch 32
+    
+    # FP16 TensorRT engine on GPU (exported once, cached next to the weights)
+    python predict.py --source test_images/ --model results/improved_model/train/weights/best.pt --precision fp16
+    
+    # DeepSparse ONNX backend for CPU-only machines
+    python predict.py --source test_images/ --model results/improved_model/train/weights/best.pt --device cpu --backend deepsparse
+    
+    # Calibrated INT8 (TensorRT on GPU, OpenVINO on CPU)
+    python predict.py --source test_images/ --model results/improved_model/train/weights/best.pt --int8 --calib-dir calib_images/
+    
     # With custom confidence threshold
     python predict.py --source test_images/ --model results/improved_model/train/weights/best.pt --conf 0.3
     
@@ -34,13 +46,21 @@ Version: 1.0.0
 """
 
 import argparse
+import copy
+import json
+import queue
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Optional, Union, List
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union, List
 import cv2
 import numpy as np
+import yaml
 from ultralytics import YOLO
+from ultralytics.utils import ops
 import torch
+import torchvision.transforms.v2.functional as TF
 from datetime import datetime
 
 # Add scripts to path
@@ -52,19 +72,99 @@ except ImportError:
     TTA_AVAILABLE = False
     print("⚠️  TTA not available. Install dependencies for Test-Time Augmentation.")
 
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+PRECISIONS = ('fp32', 'fp16', 'int8')
+BACKENDS = ('ultralytics', 'deepsparse')
+
+# Label text style used when drawing predictions
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_SCALE = 0.6
+LABEL_THICKNESS = 1
+BOX_THICKNESS = 2
+JPEG_QUALITY = 85
+
+
+if NUMBA_AVAILABLE:
+    # The kernel reproduces cv2.rectangle's outline geometry at thickness 2 only
+    assert BOX_THICKNESS == 2, "draw_boxes only matches cv2.rectangle at thickness 2"
+    
+    @numba.njit(parallel=True, cache=True)
+    def draw_boxes(image, bboxes, colors):
+        """
+        Draw 2 px box outlines in place on a BGR image, matching cv2.rectangle.
+        
+        Rows are split across threads and every row applies the boxes in
+        order, so overlapping boxes stack exactly as sequential drawing would.
+        
+        Args:
+            image: (H, W, 3) uint8 image, modified in place
+            bboxes: (N, 4) int array of [x1, y1, x2, y2]
+            colors: (N, 3) uint8 BGR color of each box
+        """
+        height, width = image.shape[0], image.shape[1]
+        half = 1
+        for y in numba.prange(height):
+            for i in range(bboxes.shape[0]):
+                x1, y1, x2, y2 = bboxes[i, 0], bboxes[i, 1], bboxes[i, 2], bboxes[i, 3]
+                if y < y1 - half or y > y2 + half:
+                    continue
+                color = colors[i]
+                left = max(x1 - half, 0)
+                right = min(x2 + half, width - 1)
+                if y <= y1 + half or y >= y2 - half:
+                    # Top or bottom edge: fill the whole span, leaving the
+                    # outermost corner pixels empty like cv2.rectangle does
+                    if y == y1 - half or y == y2 + half:
+                        left = max(x1 - half + 1, 0)
+                        right = min(x2 + half - 1, width - 1)
+                    for x in range(left, right + 1):
+                        image[y, x] = color
+                else:
+                    # Side edges only
+                    for x in range(left, min(x1 + half, width - 1) + 1):
+                        image[y, x] = color
+                    for x in range(max(x2 - half, 0), right + 1):
+                        image[y, x] = color
+
 
 class ObjectDetectionPredictor:
     """
     Production-grade inference pipeline for Space Station Safety Object Detection.
     """
     
+    # Color palette for different classes (BGR)
+    PALETTE = np.array([
+        [255, 0, 0],    # OxygenTank - Blue
+        [0, 255, 0],    # NitrogenTank - Green
+        [0, 0, 255],    # FirstAidBox - Red
+        [255, 255, 0],  # FireAlarm - Cyan
+        [255, 0, 255],  # SafetySwitchPanel - Magenta
+        [0, 255, 255],  # EmergencyPhone - Yellow
+        [128, 0, 128],  # FireExtinguisher - Purple
+    ], dtype=np.uint8)
+    
     def __init__(
         self,
         model_path: str,
         conf_threshold: float = 0.25,
         iou_threshold: float = 0.45,
         device: Optional[str] = None,
-        use_tta: bool = False
+        use_tta: bool = False,
+        precision: str = 'fp32',
+        batch_size: int = 16,
+        img_size: int = 640,
+        calib_data: Optional[str] = None,
+        backend: str = 'ultralytics',
+        max_det: int = 300,
+        half: bool = False,
+        pinned: bool = False,
+        compile_model: bool = False,
+        per_class_conf: Optional[Dict[Union[str, int], float]] = None
     ):
         """
         Initialize predictor.
@@ -75,14 +175,59 @@ class ObjectDetectionPredictor:
             iou_threshold: IoU threshold for Non-Maximum Suppression
             device: Device to use ('cpu', 'cuda', '0', '1', etc.). Auto-detect if None
             use_tta: Use Test-Time Augmentation for better accuracy
+            precision: 'fp32' runs the PyTorch model; 'fp16' or 'int8' build and
+                cache a TensorRT engine next to the model on CUDA devices, and
+                'int8' on CPU builds an OpenVINO model instead
+            batch_size: Default images per forward pass (max batch of the engine)
+            img_size: Network input size; larger frames are downscaled to it before inference
+            calib_data: Dataset YAML or image folder used for INT8 calibration
+            backend: 'ultralytics' or 'deepsparse' (CPU only, runs an exported ONNX model)
+            max_det: Maximum detections kept per image after NMS
+            half: Run the PyTorch model in FP16 on CUDA devices
+            pinned: Feed the PyTorch model from a reusable pinned-memory batch
+                buffer on CUDA devices instead of ultralytics' predictor
+            compile_model: Specialize the network with torch.compile for the fixed
+                pinned batch shape (implies ``pinned``, needs torch >= 2.1)
+            per_class_conf: Confidence floors keyed by class name or id; other
+                classes use ``conf_threshold``
         """
         self.model_path = Path(model_path)
         if not self.model_path.exists():
             raise FileNotFoundError(f"Model not found: {self.model_path}")
         
         self.conf_threshold = conf_threshold
+        self.per_class_conf = dict(per_class_conf or {})
+        # Score threshold handed to the backend, lowered below conf_threshold
+        # when a class floor is lower; _class_conf applies the exact floors
+        self._model_conf = min([conf_threshold, *self.per_class_conf.values()])
+        self._class_conf = None
         self.iou_threshold = iou_threshold
+        self.max_det = max_det
         self.use_tta = use_tta and TTA_AVAILABLE
+        self.batch_size = max(1, batch_size)
+        self.img_size = img_size
+        
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+        self.precision = precision
+        
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        self.backend = backend
+        self.pipeline = None
+        self.half = False
+        self._channels_last = False
+        self._output_dirs = set()
+        
+        # Annotated images are encoded and written off the inference thread;
+        # the semaphore bounds how many frames can wait in the queue
+        self._writer = ThreadPoolExecutor(max_workers=2)
+        self._write_slots = threading.Semaphore(2 * self.batch_size)
+        self._pending_writes = set()
+        self._pending_lock = threading.Lock()
+        self._host = None
+        self._dev = None
+        self._compiled = False
         
         # Auto-detect device if not specified
         if device is None:
@@ -98,21 +243,281 @@ class ObjectDetectionPredictor:
             print("🚀 Using Test-Time Augmentation for enhanced accuracy")
             self.predictor = TTAPredictor(
                 str(self.model_path),
-                conf_threshold=conf_threshold,
+                conf_threshold=self._model_conf,
                 iou_threshold=iou_threshold,
                 use_tta=True
             )
             self.model = self.predictor.model
         else:
-            self.model = YOLO(str(self.model_path))
-            self.model.to(self.device)
+            exported_path = None
+            if self.precision == 'int8' and self.device == 'cpu':
+                exported_path = self._export_openvino_int8(calib_data)
+            elif self.precision != 'fp32':
+                if self.device == 'cpu':
+                    print(f"⚠️  {self.precision.upper()} TensorRT engines need a CUDA device, using the .pt model")
+                else:
+                    exported_path = self._export_engine(calib_data)
+            
+            if exported_path is not None:
+                print(f"⚡ Using {self.precision.upper()} model: {exported_path}")
+                self.model = YOLO(str(exported_path), task='detect')
+            else:
+                self.model = YOLO(str(self.model_path))
+                self.model.to(self.device)
+                if self.device != 'cpu':
+                    self._tune_cuda_model(half)
+                if (pinned or compile_model) and self.backend == 'ultralytics':
+                    if self._is_cuda_device():
+                        self._allocate_pinned_buffers()
+                        if compile_model:
+                            self._compile_network()
+                    else:
+                        flag = '--compile' if compile_model else '--pinned'
+                        print(f"⚠️  {flag} needs a CUDA device, using ultralytics' predictor")
+            
+            if self.backend == 'deepsparse':
+                self.pipeline = self._create_deepsparse_pipeline()
         
         # Get class names
         self.class_names = self.model.names
+        self._build_class_conf()
+        self._build_label_cache()
         print(f"✅ Model loaded successfully!")
         print(f"📦 Classes: {list(self.class_names.values())}")
         print()
     
+    def _is_cuda_device(self) -> bool:
+        """Whether self.device names a single CUDA device."""
+        device = f"cuda:{self.device}" if self.device.isdigit() else self.device
+        try:
+            return torch.device(device).type == 'cuda'
+        except (RuntimeError, ValueError):
+            return False
+    
+    def _tune_cuda_model(self, half: bool = False) -> None:
+        """
+        Prepare the PyTorch model for fast CUDA inference.
+        
+        Enables the cuDNN autotuner. With ``half`` the weights also switch to
+        channels-last so cuDNN can pick FP16 tensor-core kernels; FP16 itself
+        is applied through ultralytics' ``half`` predict argument. Conv+bn
+        fusion is left to ultralytics' predictor, which fuses on setup.
+        """
+        torch.backends.cudnn.benchmark = True
+        torch.set_float32_matmul_precision('high')
+        
+        self.half = half
+        self._channels_last = half
+        if half:
+            self.model.model.to(memory_format=torch.channels_last)
+    
+    def _fuse_network(self) -> None:
+        """
+        Fuse conv+bn layers of the network used for pinned inference.
+        
+        The pinned path calls the network directly, bypassing ultralytics'
+        fusing predictor, so it fuses here and keeps the unfused model if a
+        one-time check on a dummy input shows the fused outputs differ.
+        """
+        net = self.model.model.eval()
+        device = next(net.parameters()).device
+        dummy = torch.rand(1, 3, self.img_size, self.img_size, device=device)
+        try:
+            unfused = copy.deepcopy(net)
+            with torch.inference_mode():
+                expected = self._forward_output(net, dummy)
+                self.model.fuse()
+                actual = self._forward_output(self.model.model, dummy)
+            if not torch.allclose(actual, expected, rtol=1e-3, atol=1e-3):
+                print("⚠️  Fused model outputs differ, using the unfused model")
+                self.model.model = unfused
+        except Exception as e:
+            print(f"⚠️  Model fusion skipped: {e}")
+    
+    @staticmethod
+    def _forward_output(net, x: torch.Tensor) -> torch.Tensor:
+        """Run net on x and return the raw prediction tensor."""
+        out = net(x)
+        return out[0] if isinstance(out, (list, tuple)) else out
+    
+    def _allocate_pinned_buffers(self) -> None:
+        """
+        Allocate the reusable host and device batch buffers for pinned inference.
+        
+        Frames are copied unpadded into the pinned uint8 host buffer and sent
+        to the device asynchronously. The letterbox resize, padding and
+        normalization then run on the GPU on a dedicated stream, and no buffer
+        is allocated per call.
+        """
+        device = f"cuda:{self.device}" if self.device.isdigit() else self.device
+        shape = (self.batch_size, self.img_size, self.img_size, 3)
+        self._host = torch.empty(shape, dtype=torch.uint8, pin_memory=True)
+        self._dev = torch.empty(shape, dtype=torch.uint8, device=device)
+        self._input = torch.empty(
+            (self.batch_size, 3, self.img_size, self.img_size),
+            dtype=torch.float16 if self.half else torch.float32,
+            device=device
+        )
+        if self._channels_last:
+            self._input = self._input.contiguous(memory_format=torch.channels_last)
+        self._copy_stream = torch.cuda.Stream(device=self._dev.device)
+        self._prep_stream = torch.cuda.Stream(device=self._dev.device)
+        self._fuse_network()
+        self._net = self.model.model.to(self._dev.device).eval()
+        if self.half:
+            self._net.half()
+        print(f"📌 Using pinned batch buffer: {tuple(shape)}")
+    
+    def _compile_network(self) -> None:
+        """
+        Compile the network for the pinned batch shape and warm it up.
+        
+        Every forward pass runs on the full pinned buffer, so the graph sees a
+        single static input shape and is captured once in __init__.
+        """
+        version = tuple(int(v) for v in torch.__version__.split('+')[0].split('.')[:2])
+        if version < (2, 1):
+            print(f"⚠️  torch.compile needs torch >= 2.1 (found {torch.__version__}), running uncompiled")
+            return
+        
+        print("🔧 Compiling network with torch.compile (one-time warm-up)...")
+        self._net = torch.compile(self._net, mode='reduce-overhead', dynamic=False, fullgraph=False)
+        self._compiled = True
+        blank = np.zeros((self.img_size, self.img_size, 3), dtype=np.uint8)
+        self._infer_pinned([blank], [1.0])
+    
+    def _export_engine(self, calib_data: Optional[str] = None) -> Optional[Path]:
+        """
+        Build a TensorRT engine for the model once and reuse it afterwards.
+        
+        The engine is cached as ``<model>_<precision>_b<batch>.engine`` beside
+        the weights, exported with a dynamic batch axis up to ``self.batch_size``.
+        
+        Returns:
+            Path to the engine, or None if TensorRT cannot be used
+        """
+        engine_path = self.model_path.with_name(
+            f"{self.model_path.stem}_{self.precision}_b{self.batch_size}.engine"
+        )
+        if engine_path.exists():
+            return engine_path
+        
+        source = YOLO(str(self.model_path))
+        export_args = dict(
+            format='engine',
+            imgsz=self.img_size,
+            dynamic=True,
+            batch=self.batch_size,
+            workspace=4,
+            device=self.device,
+            verbose=False
+        )
+        if self.precision == 'fp16':
+            export_args['half'] = True
+        else:
+            data = self._resolve_calib_data(calib_data, source.names)
+            if data is None:
+                return None
+            export_args.update(int8=True, data=data)
+        
+        print(f"🔧 Exporting TensorRT {self.precision.upper()} engine (one-time)...")
+        try:
+            exported = source.export(**export_args)
+        except Exception as e:
+            print(f"⚠️  TensorRT export failed ({e}), using the .pt model")
+            return None
+        
+        Path(exported).replace(engine_path)
+        return engine_path
+    
+    def _export_openvino_int8(self, calib_data: Optional[str] = None) -> Optional[Path]:
+        """
+        Build a calibrated INT8 OpenVINO model for CPU inference once and reuse it.
+        
+        Returns:
+            Path to the cached OpenVINO model directory, or None if export fails
+        """
+        model_dir = self.model_path.with_name(f"{self.model_path.stem}_int8_openvino_model")
+        if model_dir.exists():
+            return model_dir
+        
+        source = YOLO(str(self.model_path))
+        data = self._resolve_calib_data(calib_data, source.names)
+        if data is None:
+            return None
+        
+        print("🔧 Exporting INT8 OpenVINO model (one-time)...")
+        try:
+            exported = source.export(
+                format='openvino', int8=True, data=data, imgsz=self.img_size, verbose=False
+            )
+        except Exception as e:
+            print(f"⚠️  OpenVINO export failed ({e}), using the .pt model")
+            return None
+        
+        Path(exported).replace(model_dir)
+        return model_dir
+    
+    def _resolve_calib_data(self, calib_data: Optional[str], names: dict) -> Optional[str]:
+        """
+        Turn the calibration source into a dataset YAML for INT8 export.
+        
+        A YAML file is used as-is. A folder of images gets a minimal dataset
+        YAML pointing at it, written next to the model weights.
+        """
+        if calib_data is None:
+            print("⚠️  INT8 export needs calibration data (--calib-dir or --calib-data), using the .pt model")
+            return None
+        
+        calib_path = Path(calib_data)
+        if not calib_path.exists():
+            print(f"⚠️  Calibration data not found: {calib_path}, using the .pt model")
+            return None
+        if not calib_path.is_dir():
+            return str(calib_path)
+        
+        yaml_path = self.model_path.with_name(f"{self.model_path.stem}_calib.yaml")
+        with open(yaml_path, 'w') as f:
+            yaml.safe_dump({
+                'path': str(calib_path.resolve()),
+                'train': '.',
+                'val': '.',
+                'nc': len(names),
+                'names': dict(names)
+            }, f, sort_keys=False)
+        print("⚠️  INT8 accuracy depends on calibration images; validate on your own data")
+        return str(yaml_path)
+    
+    def _create_deepsparse_pipeline(self):
+        """
+        Create a DeepSparse YOLOv8 pipeline from a cached ONNX export.
+        
+        Returns:
+            DeepSparse pipeline, or None if it cannot be used
+        """
+        if self.device != 'cpu':
+            print("⚠️  DeepSparse backend runs on CPU only, using ultralytics")
+            return None
+        
+        try:
+            from deepsparse import Pipeline
+        except ImportError:
+            print("⚠️  DeepSparse not installed (pip install deepsparse), using ultralytics")
+            return None
+        
+        # Dedicated name so the ONNX left behind by a TensorRT export is never reused
+        onnx_path = self.model_path.with_name(f"{self.model_path.stem}_deepsparse.onnx")
+        if not onnx_path.exists():
+            print("🔧 Exporting ONNX model for DeepSparse (one-time)...")
+            # Always export from the .pt weights; self.model may be an engine or OpenVINO model
+            exported = YOLO(str(self.model_path)).export(
+                format='onnx', opset=13, simplify=True, imgsz=self.img_size, verbose=False
+            )
+            Path(exported).replace(onnx_path)
+        
+        print(f"⚡ Using DeepSparse pipeline: {onnx_path}")
+        return Pipeline.create(task='yolov8', model_path=str(onnx_path))
+    
     def predict_image(
         self,
         image_path: Union[str, Path],
@@ -135,38 +540,26 @@ class ObjectDetectionPredictor:
             raise FileNotFoundError(f"Image not found: {image_path}")
         
         # Read image
-        image = cv2.imread(str(image_path))
+        image = self._read_image(image_path)
         if image is None:
             raise ValueError(f"Failed to read image: {image_path}")
         
         # Run inference
         if self.use_tta:
-            results = self.predictor.predict_single(image, preprocess=True)
+            # TTA fuses its augmented passes and returns detection dicts directly
+            predictions = self._filter_class_conf(
+                self.predictor.predict_single(image, preprocess=True)
+            )
         else:
-            results = self.model.predict(
-                source=image,
-                conf=self.conf_threshold,
-                iou=self.iou_threshold,
-                device=self.device,
-                verbose=False
-            )[0]
-        
-        # Extract predictions
-        predictions = self._extract_predictions(results)
+            predictions = self._infer([image])[0]
         
         # Save annotated image if requested
         if save_output:
             if output_dir is None:
                 output_dir = Path('predictions')
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Draw predictions on image
-            annotated_image = self._draw_predictions(image.copy(), predictions)
-            
-            # Save
-            output_path = output_dir / f"{image_path.stem}_predicted{image_path.suffix}"
-            cv2.imwrite(str(output_path), annotated_image)
-            print(f"💾 Saved: {output_path}")
+            self._ensure_output_dir(output_dir)
+            # The frame was decoded here and is not reused, so draw on it directly
+            self._save_annotated(image, image_path, predictions, output_dir)
         
         return {
             'image_path': str(image_path),
@@ -180,104 +573,589 @@ class ObjectDetectionPredictor:
         source_dir: Union[str, Path],
         save_output: bool = True,
         output_dir: Optional[Path] = None,
-        extensions: List[str] = ['.jpg', '.jpeg', '.png', '.bmp']
+        extensions: List[str] = ['.jpg', '.jpeg', '.png', '.bmp'],
+        batch_size: Optional[int] = None
     ) -> List[dict]:
         """
         Run inference on all images in a directory.
         
+        Collects the output of :meth:`iter_batch`; use that directly to
+        stream very large directories without holding every result in memory.
+        
         Args:
             source_dir: Directory containing images
             save_output: Whether to save annotated images
             output_dir: Directory to save outputs
             extensions: Image file extensions to process
+            batch_size: Number of images per forward pass (default: self.batch_size)
             
         Returns:
             List of prediction dictionaries
         """
+        return list(self.iter_batch(source_dir, save_output, output_dir, extensions, batch_size))
+    
+    def iter_batch(
+        self,
+        source_dir: Union[str, Path],
+        save_output: bool = True,
+        output_dir: Optional[Path] = None,
+        extensions: List[str] = ['.jpg', '.jpeg', '.png', '.bmp'],
+        batch_size: Optional[int] = None
+    ) -> Iterator[dict]:
+        """
+        Run inference on all images in a directory, yielding one result at a time.
+        
+        Files are discovered lazily, decoded in a thread pool and sent to the
+        model in batches of ``batch_size`` so each forward pass covers many frames.
+        
+        Args:
+            source_dir: Directory containing images
+            save_output: Whether to save annotated images
+            output_dir: Directory to save outputs
+            extensions: Image file extensions to process
+            batch_size: Number of images per forward pass (default: self.batch_size)
+            
+        Yields:
+            Prediction dictionary for each successfully processed image
+        """
         source_dir = Path(source_dir)
         if not source_dir.exists():
             raise FileNotFoundError(f"Directory not found: {source_dir}")
+        if not source_dir.is_dir():
+            raise NotADirectoryError(f"Not a directory: {source_dir}")
+        
+        if save_output:
+            if output_dir is None:
+                output_dir = Path('predictions')
+            self._ensure_output_dir(output_dir)
         
-        # Find all images
-        image_files = []
-        for ext in extensions:
-            image_files.extend(source_dir.glob(f"*{ext}"))
-            image_files.extend(source_dir.glob(f"*{ext.upper()}"))
+        image_files = self._iter_images(source_dir, extensions)
+        num_found = 0
         
-        if not image_files:
+        batch_size = max(1, batch_size or self.batch_size)
+        try:
+            # TTA runs several augmented passes per image and cannot be batched
+            if self.use_tta:
+                for img_path in image_files:
+                    num_found += 1
+                    print(f"Processing: {img_path.name}...")
+                    try:
+                        pred = self.predict_image(img_path, save_output, output_dir)
+                        print(f"  ✅ Detected {pred['num_detections']} objects")
+                        print()
+                        yield pred
+                    except Exception as e:
+                        print(f"  ❌ Error: {str(e)}")
+                        print()
+            else:
+                paths, frames = [], []
+                for img_path, image in self._prefetch_images(image_files, 2 * batch_size):
+                    num_found += 1
+                    if image is None:
+                        print(f"Processing: {img_path.name}...")
+                        print(f"  ❌ Error: Failed to read image: {img_path}")
+                        print()
+                        continue
+                    paths.append(img_path)
+                    frames.append(image)
+                    if len(frames) == batch_size:
+                        yield from self._predict_frames(paths, frames, save_output, output_dir, batch_size)
+                        paths, frames = [], []
+                if frames:
+                    yield from self._predict_frames(paths, frames, save_output, output_dir, batch_size)
+        finally:
+            self.flush()
+        
+        if num_found == 0:
             print(f"⚠️  No images found in {source_dir}")
-            return []
+    
+    @staticmethod
+    def _iter_images(source_dir: Path, extensions: List[str]) -> Iterator[Path]:
+        """Lazily yield image files directly inside source_dir, matching extensions case-insensitively."""
+        exts = {ext.lower() for ext in extensions}
+        for path in source_dir.iterdir():
+            if path.suffix.lower() in exts and path.is_file():
+                yield path
+    
+    def _prefetch_images(
+        self,
+        image_files: Iterable[Path],
+        queue_size: int,
+        num_workers: int = 4
+    ) -> Iterator[Tuple[Path, Optional[np.ndarray]]]:
+        """
+        Yield (path, image) pairs in order while decoding ahead in a thread pool.
         
-        print(f"📁 Found {len(image_files)} images")
-        print()
+        A producer thread submits reads to the pool and parks the futures in a
+        bounded queue, so at most ``queue_size`` decoded frames are held in
+        memory while the caller runs inference on earlier ones.
+        """
+        pending = queue.Queue(maxsize=queue_size)
+        stop = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=num_workers)
+        
+        def produce():
+            # Always post the sentinel, carrying any discovery error to the consumer
+            error = None
+            try:
+                for img_path in image_files:
+                    if stop.is_set():
+                        break
+                    pending.put((img_path, pool.submit(self._read_image, img_path)))
+            except Exception as e:
+                error = e
+            finally:
+                pending.put((None, error))
+        
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                img_path, future = pending.get()
+                if img_path is None:
+                    if future is not None:
+                        raise future
+                    break
+                try:
+                    image = future.result()
+                except Exception:
+                    image = None
+                yield img_path, image
+        finally:
+            stop.set()
+            # Drain so a producer blocked on a full queue can exit
+            while producer.is_alive():
+                try:
+                    pending.get_nowait()
+                except queue.Empty:
+                    producer.join(timeout=0.05)
+            pool.shutdown(wait=True)
+    
+    @staticmethod
+    def _read_image(image_path: Path) -> Optional[np.ndarray]:
+        """
+        Read an image file into a BGR array.
         
-        # Process each image
-        all_predictions = []
-        for img_path in image_files:
+        The file is read as raw bytes and decoded from memory, keeping the
+        blocking read separate from the JPEG/PNG decode.
+        """
+        with open(image_path, 'rb') as f:
+            buf = f.read()
+        if not buf:
+            return None
+        return cv2.imdecode(np.frombuffer(buf, np.uint8), cv2.IMREAD_COLOR)
+    
+    def _predict_frames(
+        self,
+        paths: List[Path],
+        frames: List[np.ndarray],
+        save_output: bool,
+        output_dir: Optional[Path],
+        batch_size: int
+    ) -> List[dict]:
+        """Run one batched forward pass and build per-image prediction dicts."""
+        try:
+            batch_predictions = self._infer(frames, batch_size)
+        except Exception as e:
+            for img_path in paths:
+                print(f"Processing: {img_path.name}...")
+                print(f"  ❌ Error: {str(e)}")
+                print()
+            return []
+        
+        outputs = []
+        for img_path, image, predictions in zip(paths, frames, batch_predictions):
             print(f"Processing: {img_path.name}...")
             try:
-                pred = self.predict_image(img_path, save_output, output_dir)
-                all_predictions.append(pred)
-                print(f"  ✅ Detected {pred['num_detections']} objects")
+                if save_output:
+                    self._save_annotated(image, img_path, predictions, output_dir)
+                outputs.append({
+                    'image_path': str(img_path),
+                    'image_size': image.shape[:2],
+                    'predictions': predictions,
+                    'num_detections': len(predictions)
+                })
+                print(f"  ✅ Detected {len(predictions)} objects")
             except Exception as e:
                 print(f"  ❌ Error: {str(e)}")
             print()
         
-        return all_predictions
+        return outputs
+    
+    def _ensure_output_dir(self, output_dir: Path) -> None:
+        """Create output_dir the first time it is used."""
+        if output_dir not in self._output_dirs:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            self._output_dirs.add(output_dir)
+    
+    def _save_annotated(
+        self,
+        image: np.ndarray,
+        image_path: Path,
+        predictions: List[dict],
+        output_dir: Path,
+        inplace: bool = True
+    ) -> Path:
+        """
+        Draw predictions on the image and queue it for writing to output_dir.
+        
+        The boxes are drawn into ``image`` itself unless ``inplace`` is False.
+        Encoding and the disk write run on the writer pool; call :meth:`flush`
+        or :meth:`close` to wait for them.
+        """
+        annotated_image = self._draw_predictions(
+            image if inplace else image.copy(), predictions
+        )
+        output_path = output_dir / f"{image_path.stem}_predicted{image_path.suffix}"
+        self._submit_write(output_path, annotated_image)
+        print(f"💾 Saved: {output_path}")
+        return output_path
+    
+    def _submit_write(self, output_path: Path, image: np.ndarray) -> None:
+        """Queue an image write, blocking while too many writes are already pending."""
+        self._write_slots.acquire()
+        try:
+            future = self._writer.submit(
+                cv2.imwrite, str(output_path), image, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]
+            )
+        except Exception:
+            self._write_slots.release()
+            raise
+        with self._pending_lock:
+            self._pending_writes.add(future)
+        
+        def done(f):
+            with self._pending_lock:
+                self._pending_writes.discard(f)
+            self._write_slots.release()
+            if f.exception() is not None or not f.result():
+                print(f"  ❌ Error: Failed to write {output_path}")
+        
+        future.add_done_callback(done)
+    
+    def flush(self) -> None:
+        """Wait for all queued image writes to finish."""
+        with self._pending_lock:
+            pending = list(self._pending_writes)
+        wait(pending)
+    
+    def close(self) -> None:
+        """Flush pending writes and stop the writer pool."""
+        writer = getattr(self, '_writer', None)
+        if writer is not None:
+            writer.shutdown(wait=True)
+            self._writer = None
+    
+    def __del__(self):
+        self.close()
+    
+    def _infer(self, frames: List[np.ndarray], batch_size: Optional[int] = None) -> List[List[dict]]:
+        """Run the active backend on decoded frames and return predictions per frame."""
+        # Shrink large frames to the network size up front so the backend's
+        # letterbox and color conversion touch far fewer pixels
+        resized = [self._resize_to_input(frame) for frame in frames]
+        inputs = [frame for frame, _ in resized]
+        ratios = [r for _, r in resized]
+        
+        if self._host is not None:
+            return self._infer_pinned(inputs, ratios)
+        
+        if self.pipeline is not None:
+            output = self.pipeline(
+                images=inputs,
+                iou_thres=self.iou_threshold,
+                conf_thres=self._model_conf
+            )
+            return [
+                self._build_predictions(
+                    np.asarray(boxes, dtype=np.float32).reshape(-1, 4),
+                    np.asarray([float(label) for label in labels], dtype=np.int32),
+                    np.asarray(scores, dtype=np.float32),
+                    scale=1.0 / r
+                )
+                for boxes, scores, labels, r in zip(
+                    output.boxes, output.scores, output.labels, ratios
+                )
+            ]
+        
+        batch_results = self.model.predict(
+            source=inputs,
+            conf=self._model_conf,
+            iou=self.iou_threshold,
+            imgsz=self.img_size,
+            device=self.device,
+            batch=batch_size or self.batch_size,
+            agnostic_nms=False,  # class-aware batched NMS on the inference device
+            max_det=self.max_det,
+            half=self.half,
+            verbose=False
+        )
+        return [
+            self._extract_predictions(results, scale=1.0 / r)
+            for results, r in zip(batch_results, ratios)
+        ]
+    
+    def _infer_pinned(self, frames: List[np.ndarray], ratios: List[float]) -> List[List[dict]]:
+        """Run the network directly on frames staged through the pinned batch buffer."""
+        capacity, size = self._host.shape[0], self.img_size
+        outputs = []
+        for start in range(0, len(frames), capacity):
+            chunk = frames[start:start + capacity]
+            n = len(chunk)
+            # A compiled graph always gets the full buffer to keep its input shape fixed
+            rows = capacity if self._compiled else n
+            
+            # Frames already fit in a slot (see _resize_to_input); stage them unpadded
+            shapes = []
+            for i, frame in enumerate(chunk):
+                h, w = frame.shape[:2]
+                self._host[i, :h, :w].numpy()[:] = frame
+                shapes.append((h, w))
+            
+            # Copy each frame on its own stream so frame i+1 is in flight
+            # while frame i is letterboxed on the preprocess stream
+            copied = []
+            with torch.cuda.stream(self._copy_stream):
+                for i, (h, w) in enumerate(shapes):
+                    self._dev[i, :h].copy_(self._host[i, :h], non_blocking=True)
+                    event = torch.cuda.Event()
+                    event.record(self._copy_stream)
+                    copied.append(event)
+            
+            letterbox = []
+            with torch.inference_mode(), torch.cuda.stream(self._prep_stream):
+                self._input[:rows].fill_(114 / 255)
+                for i, (h, w) in enumerate(shapes):
+                    self._prep_stream.wait_event(copied[i])
+                    r = size / max(h, w)
+                    nh, nw = int(round(h * r)), int(round(w * r))
+                    top, left = (size - nh) // 2, (size - nw) // 2
+                    # BGR HWC uint8 -> RGB CHW float in [0, 1]
+                    img = self._dev[i, :h, :w].permute(2, 0, 1).flip(0).to(self._input.dtype)
+                    if (nh, nw) != (h, w):
+                        img = TF.resize(img, [nh, nw], antialias=False)
+                    self._input[i, :, top:top + nh, left:left + nw] = img.div_(255)
+                    letterbox.append(((h, w), r, left, top))
+            # The buffers may live on a device other than the current one
+            torch.cuda.current_stream(self._dev.device).wait_stream(self._prep_stream)
+            
+            with torch.inference_mode(), torch.cuda.device(self._dev.device):
+                preds = self._net(self._input[:rows])
+                if isinstance(preds, (list, tuple)):
+                    preds = preds[0]
+                detections = ops.non_max_suppression(
+                    preds[:n],
+                    self._model_conf,
+                    self.iou_threshold,
+                    agnostic=False,
+                    max_det=self.max_det
+                )
+            
+            for det, ((h, w), r, left, top), r0 in zip(
+                detections, letterbox, ratios[start:start + n]
+            ):
+                # Undo the letterbox on the host copy
+                det = det.float().cpu().numpy()
+                det[:, [0, 2]] = np.clip((det[:, [0, 2]] - left) / r, 0, w)
+                det[:, [1, 3]] = np.clip((det[:, [1, 3]] - top) / r, 0, h)
+                outputs.append(self._build_predictions(
+                    det[:, :4], det[:, 5].astype(np.int32), det[:, 4], scale=1.0 / r0
+                ))
+        
+        return outputs
+    
+    def _resize_to_input(self, image: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        Downscale an image so its longer side equals the network input size.
+        
+        Returns:
+            Tuple of (resized image, scale ratio applied). Images already small
+            enough are returned unchanged with a ratio of 1.0.
+        """
+        h0, w0 = image.shape[:2]
+        r = self.img_size / max(h0, w0)
+        if r >= 1.0:
+            return image, 1.0
+        resized = cv2.resize(
+            image, (int(round(w0 * r)), int(round(h0 * r))), interpolation=cv2.INTER_LINEAR
+        )
+        return resized, r
+    
+    def _extract_predictions(self, results, scale: float = 1.0) -> List[dict]:
+        """Extract predictions from YOLO results, scaling boxes by ``scale``."""
+        if not hasattr(results, 'boxes') or len(results.boxes) == 0:
+            return []
+        
+        # One device-to-host copy per tensor instead of one per detection
+        boxes = results.boxes
+        xyxy = boxes.xyxy.detach().cpu().numpy()
+        cls = boxes.cls.detach().cpu().numpy().astype(np.int32)
+        conf = boxes.conf.detach().cpu().numpy()
+        
+        return self._build_predictions(xyxy, cls, conf, scale=scale)
     
-    def _extract_predictions(self, results) -> List[dict]:
-        """Extract predictions from YOLO results."""
-        predictions = []
+    def _build_predictions(
+        self,
+        xyxy: np.ndarray,
+        cls: np.ndarray,
+        conf: np.ndarray,
+        scale: float = 1.0
+    ) -> List[dict]:
+        """
+        Build prediction dicts from host arrays of boxes, class ids and scores.
         
-        if hasattr(results, 'boxes'):
-            boxes = results.boxes
-            for i in range(len(boxes)):
-                pred = {
-                    'class_id': int(boxes.cls[i]),
-                    'class_name': self.class_names[int(boxes.cls[i])],
-                    'confidence': float(boxes.conf[i]),
-                    'bbox': boxes.xyxy[i].cpu().numpy().tolist()  # [x1, y1, x2, y2]
-                }
-                predictions.append(pred)
+        Detections below their class confidence floor are dropped with one
+        vectorized mask. ``scale`` maps boxes from the inference frame back to
+        the source image.
+        """
+        if self._class_conf is not None and len(conf):
+            mask = conf >= self._class_conf[cls]
+            xyxy, cls, conf = xyxy[mask], cls[mask], conf[mask]
+        if scale != 1.0:
+            xyxy = xyxy * scale
+        return [
+            {
+                'class_id': int(c),
+                'class_name': self.class_names[int(c)],
+                'confidence': float(p),
+                'bbox': b.tolist()  # [x1, y1, x2, y2]
+            }
+            for c, p, b in zip(cls, conf, xyxy)
+        ]
+    
+    def _filter_class_conf(self, predictions: List[dict]) -> List[dict]:
+        """Drop prediction dicts below their class confidence floor."""
+        if self._class_conf is None or not predictions:
+            return predictions
+        cls = np.asarray([p['class_id'] for p in predictions], dtype=np.int32)
+        conf = np.asarray([p['confidence'] for p in predictions], dtype=np.float32)
+        mask = conf >= self._class_conf[cls]
+        return [p for p, keep in zip(predictions, mask) if keep]
+    
+    def _build_class_conf(self) -> None:
+        """Build the per-class confidence floor table indexed by class id."""
+        if not self.per_class_conf:
+            return
         
-        return predictions
+        name_to_id = {name: class_id for class_id, name in self.class_names.items()}
+        table = np.full(max(self.class_names) + 1, self.conf_threshold, dtype=np.float32)
+        for key, threshold in self.per_class_conf.items():
+            class_id = name_to_id.get(key, key)
+            if isinstance(class_id, str) and class_id.isdigit():
+                class_id = int(class_id)
+            if not isinstance(class_id, int) or not 0 <= class_id < len(table):
+                raise ValueError(f"Unknown class in per-class confidence: {key}")
+            table[class_id] = threshold
+        self._class_conf = table
+    
+    def _build_label_cache(self) -> None:
+        """
+        Pre-render the "<class_name> " part of every label onto its colored background.
+        
+        Only the confidence digits change between detections, so drawing a
+        label becomes one array copy plus a short putText call.
+        """
+        (suffix_w, _), _ = cv2.getTextSize("0.00", LABEL_FONT, LABEL_SCALE, LABEL_THICKNESS)
+        self._palette = self.PALETTE
+        self._label_cache = {}
+        for class_id, class_name in self.class_names.items():
+            prefix = f"{class_name} "
+            (label_w, label_h), _ = cv2.getTextSize(
+                prefix + "0.00", LABEL_FONT, LABEL_SCALE, LABEL_THICKNESS
+            )
+            # Digits share one advance width, so the suffix always starts here
+            prefix_w = label_w - suffix_w
+            color = self._palette[class_id % len(self._palette)].tolist()
+            
+            # Same extent as the filled rectangle (x1, y1 - label_h - 10)..(x1 + label_w, y1)
+            patch = np.empty((label_h + 11, label_w + 1, 3), dtype=np.uint8)
+            patch[:] = color
+            cv2.putText(
+                patch, prefix, (0, label_h + 5),
+                LABEL_FONT, LABEL_SCALE, (255, 255, 255), LABEL_THICKNESS
+            )
+            self._label_cache[class_id] = (patch, prefix_w, label_h)
+    
+    @staticmethod
+    def _blit(image: np.ndarray, patch: np.ndarray, x: int, y: int) -> None:
+        """Copy patch into image with its top-left corner at (x, y), clipped to the image."""
+        h, w = patch.shape[:2]
+        img_h, img_w = image.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, img_w), min(y + h, img_h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        image[y0:y1, x0:x1] = patch[y0 - y:y1 - y, x0 - x:x1 - x]
     
     def _draw_predictions(self, image: np.ndarray, predictions: List[dict]) -> np.ndarray:
         """Draw bounding boxes and labels on image."""
-        # Color palette for different classes
-        colors = [
-            (255, 0, 0),    # OxygenTank - Blue
-            (0, 255, 0),    # NitrogenTank - Green
-            (0, 0, 255),    # FirstAidBox - Red
-            (255, 255, 0),  # FireAlarm - Cyan
-            (255, 0, 255),  # SafetySwitchPanel - Magenta
-            (0, 255, 255),  # EmergencyPhone - Yellow
-            (128, 0, 128),  # FireExtinguisher - Purple
-        ]
+        if not predictions:
+            return image
+        
+        # Look up every detection's color in one go
+        class_ids = np.asarray([p['class_id'] for p in predictions], dtype=np.int64)
+        color_table = np.take(self._palette, class_ids % len(self._palette), axis=0)
+        
+        colors = color_table.tolist()
         
-        for pred in predictions:
+        # Draw all bounding boxes first, then all labels, so labels always sit
+        # on top of box outlines and the output is the same with or without Numba
+        if NUMBA_AVAILABLE:
+            draw_boxes(
+                image,
+                np.array([p['bbox'] for p in predictions], dtype=np.float64).astype(np.int64),
+                color_table
+            )
+        else:
+            for pred, color in zip(predictions, colors):
+                x1, y1, x2, y2 = map(int, pred['bbox'])
+                cv2.rectangle(image, (x1, y1), (x2, y2), color, BOX_THICKNESS)
+        
+        for pred, color in zip(predictions, colors):
             class_id = pred['class_id']
-            class_name = pred['class_name']
             confidence = pred['confidence']
             x1, y1, x2, y2 = map(int, pred['bbox'])
             
-            # Get color
-            color = colors[class_id % len(colors)]
-            
-            # Draw bounding box
-            cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
+            cached = self._label_cache.get(class_id)
+            if cached is None:
+                # Class missing from the cache, render the whole label
+                label = f"{pred['class_name']} {confidence:.2f}"
+                (label_w, label_h), _ = cv2.getTextSize(label, LABEL_FONT, LABEL_SCALE, LABEL_THICKNESS)
+                cv2.rectangle(image, (x1, y1 - label_h - 10), (x1 + label_w, y1), color, -1)
+                cv2.putText(image, label, (x1, y1 - 5), LABEL_FONT, LABEL_SCALE, (255, 255, 255), LABEL_THICKNESS)
+                continue
             
-            # Draw label background
-            label = f"{class_name} {confidence:.2f}"
-            (label_w, label_h), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)
-            cv2.rectangle(image, (x1, y1 - label_h - 10), (x1 + label_w, y1), color, -1)
+            # Draw label background and class name from the cache
+            patch, prefix_w, label_h = cached
+            self._blit(image, patch, x1, y1 - label_h - 10)
             
-            # Draw label text
-            cv2.putText(image, label, (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+            # Draw confidence text
+            cv2.putText(
+                image, f"{confidence:.2f}", (x1 + prefix_w, y1 - 5),
+                LABEL_FONT, LABEL_SCALE, (255, 255, 255), LABEL_THICKNESS
+            )
         
         return image
 
 
+def parse_per_class_conf(value: str) -> Dict[str, float]:
+    """Parse "class:thr,class:thr" into a {class: threshold} dict for argparse."""
+    floors = {}
+    for item in value.split(','):
+        if not item.strip():
+            continue
+        name, sep, threshold = item.rpartition(':')
+        try:
+            if not sep or not name.strip():
+                raise ValueError
+            floors[name.strip()] = float(threshold)
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                f"Invalid per-class confidence '{item}', expected class:threshold"
+            )
+    return floors
+
+
 def main():
     """Main entry point for inference script."""
     parser = argparse.ArgumentParser(
@@ -320,6 +1198,13 @@ Examples:
         help='Confidence threshold (0-1). Default: 0.25'
     )
     
+    parser.add_argument(
+        '--per-class-conf',
+        type=parse_per_class_conf,
+        default=None,
+        help='Per-class confidence floors, e.g. "FireAlarm:0.5,3:0.4" (class name or id)'
+    )
+    
     parser.add_argument(
         '--iou',
         type=float,
@@ -327,6 +1212,13 @@ Examples:
         help='IoU threshold for NMS (0-1). Default: 0.45'
     )
     
+    parser.add_argument(
+        '--max-det',
+        type=int,
+        default=300,
+        help='Maximum detections per image after NMS. Default: 300'
+    )
+    
     parser.add_argument(
         '--device',
         type=str,
@@ -341,6 +1233,67 @@ Examples:
         help='Output directory for predictions. Default: predictions/'
     )
     
+    parser.add_argument(
+        '--batch',
+        type=int,
+        default=16,
+        help='Images per forward pass for batch inference. Default: 16'
+    )
+    
+    parser.add_argument(
+        '--precision',
+        type=str,
+        choices=PRECISIONS,
+        default='fp32',
+        help='Inference precision. fp16/int8 export a cached TensorRT engine on CUDA. Default: fp32'
+    )
+    
+    parser.add_argument(
+        '--int8',
+        action='store_true',
+        help='Shorthand for --precision int8 (TensorRT on CUDA, OpenVINO on CPU)'
+    )
+    
+    parser.add_argument(
+        '--calib-dir',
+        type=str,
+        default=None,
+        help='Folder of representative images for INT8 calibration'
+    )
+    
+    parser.add_argument(
+        '--calib-data',
+        type=str,
+        default=None,
+        help='Dataset YAML for INT8 calibration (e.g. configs/dataset.yaml)'
+    )
+    
+    parser.add_argument(
+        '--half',
+        action='store_true',
+        help='Run the PyTorch model in FP16 with channels-last weights on CUDA (ignored on CPU and TensorRT engines)'
+    )
+    
+    parser.add_argument(
+        '--pinned',
+        action='store_true',
+        help='Stage batches through a reusable pinned-memory buffer on CUDA'
+    )
+    
+    parser.add_argument(
+        '--compile',
+        action='store_true',
+        help='Specialize the network with torch.compile for a fixed batch shape (CUDA, torch>=2.1; implies --pinned)'
+    )
+    
+    parser.add_argument(
+        '--backend',
+        type=str,
+        choices=BACKENDS,
+        default='ultralytics',
+        help='Inference backend. deepsparse runs an exported ONNX model on CPU. Default: ultralytics'
+    )
+    
     parser.add_argument(
         '--tta',
         action='store_true',
@@ -368,7 +1321,16 @@ Examples:
             conf_threshold=args.conf,
             iou_threshold=args.iou,
             device=args.device,
-            use_tta=args.tta
+            use_tta=args.tta,
+            precision='int8' if args.int8 else args.precision,
+            batch_size=args.batch,
+            calib_data=args.calib_dir or args.calib_data,
+            backend=args.backend,
+            max_det=args.max_det,
+            half=args.half,
+            pinned=args.pinned,
+            compile_model=args.compile,
+            per_class_conf=args.per_class_conf
         )
     except Exception as e:
         print(f"❌ Error loading model: {str(e)}")
@@ -404,24 +1366,44 @@ Examples:
             # Batch inference
             print(f"🔍 Running batch inference on: {source}")
             print()
-            results = predictor.predict_batch(source, not args.no_save, output_dir)
+            
+            # Stream results to NDJSON so memory stays flat for large directories
+            num_images = 0
+            total_detections = 0
+            results_file = None
+            if output_dir is not None:
+                output_dir.mkdir(parents=True, exist_ok=True)
+                results_file = open(output_dir / 'results.ndjson', 'w')
+            try:
+                for pred in predictor.iter_batch(source, not args.no_save, output_dir):
+                    num_images += 1
+                    total_detections += pred['num_detections']
+                    if results_file is not None:
+                        results_file.write(json.dumps(pred) + '\n')
+            finally:
+                if results_file is not None:
+                    results_file.close()
             
             # Print summary
             print()
             print("=" * 80)
             print("📊 SUMMARY")
             print("=" * 80)
-            print(f"Total images processed: {len(results)}")
-            total_detections = sum(r['num_detections'] for r in results)
+            print(f"Total images processed: {num_images}")
             print(f"Total detections: {total_detections}")
-            if results:
-                avg_detections = total_detections / len(results)
+            if num_images:
+                avg_detections = total_detections / num_images
                 print(f"Average detections per image: {avg_detections:.2f}")
+            if results_file is not None:
+                print(f"Results written to: {output_dir / 'results.ndjson'}")
         
         else:
             print(f"❌ Error: {source} is neither a file nor a directory")
             return 1
         
+        # Wait for queued annotated images to reach disk
+        predictor.close()
+        
         print()
         print("✅ Inference completed successfully!")
         if not args.no_save:
@@ -435,6 +1417,9 @@ Examples:
         import traceback
         traceback.print_exc()
         return 1
+    
+    finally:
+        predictor.close()
 
 
 if __name__ == "__main__":
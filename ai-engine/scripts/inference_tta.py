@@ -28,6 +28,7 @@ import numpy as np
 import cv2
 from ultralytics import YOLO
 import torch
+import torchvision
 from tqdm import tqdm
 
 sys.path.append(str(Path(__file__).parent.parent))
@@ -139,94 +140,106 @@ class TTAPredictor:
         Returns:
             Ensemble predictions
         """
-        all_predictions = []
+        h, w = image.shape[:2]
         
-        # Original image
-        results = self.model(
+        # Augmentations sharing the base input size go through one batched call:
+        # original, horizontal flip and two brightness variations
+        views = [
             image,
-            conf=self.conf_threshold,
-            iou=self.iou_threshold,
-            imgsz=self.img_size,
-            verbose=False
-        )
-        if len(results) > 0 and len(results[0].boxes) > 0:
-            all_predictions.append((results[0], 1.0))  # weight = 1.0
-        
-        # Horizontal flip
-        flipped = cv2.flip(image, 1)
+            cv2.flip(image, 1),
+            cv2.convertScaleAbs(image, alpha=0.85, beta=0),
+            cv2.convertScaleAbs(image, alpha=1.15, beta=0),
+        ]
+        view_weights = [1.0, 0.8, 0.6, 0.6]
         results = self.model(
-            flipped,
+            views,
             conf=self.conf_threshold,
             iou=self.iou_threshold,
             imgsz=self.img_size,
             verbose=False
         )
-        if len(results) > 0 and len(results[0].boxes) > 0:
-            # Unflip predictions
-            boxes = results[0].boxes
-            h, w = image.shape[:2]
-            for i, box in enumerate(boxes.xyxy):
-                x1, y1, x2, y2 = box
-                boxes.xyxy[i] = torch.tensor([w - x2, y1, w - x1, y2])
-            all_predictions.append((results[0], 0.8))  # weight = 0.8
         
         # Multi-scale inference
         for scale in [0.9, 1.1]:
             scaled_size = int(self.img_size * scale)
-            results = self.model(
+            results += self.model(
                 image,
                 conf=self.conf_threshold,
                 iou=self.iou_threshold,
                 imgsz=scaled_size,
                 verbose=False
             )
-            if len(results) > 0 and len(results[0].boxes) > 0:
-                all_predictions.append((results[0], 0.7))  # weight = 0.7
+            view_weights.append(0.7)
         
-        # Brightness variations
-        for brightness in [0.85, 1.15]:
-            adjusted = cv2.convertScaleAbs(image, alpha=brightness, beta=0)
-            results = self.model(
-                adjusted,
-                conf=self.conf_threshold,
-                iou=self.iou_threshold,
-                imgsz=self.img_size,
-                verbose=False
+        all_predictions = []
+        for idx, (result, weight) in enumerate(zip(results, view_weights)):
+            if len(result.boxes) == 0:
+                continue
+            xyxy = result.boxes.xyxy
+            if idx == 1:
+                # Unflip predictions
+                xyxy = torch.stack(
+                    [w - xyxy[:, 2], xyxy[:, 1], w - xyxy[:, 0], xyxy[:, 3]], dim=1
+                )
+            all_predictions.append(
+                (xyxy, result.boxes.conf, result.boxes.cls, weight)
             )
-            if len(results) > 0 and len(results[0].boxes) > 0:
-                all_predictions.append((results[0], 0.6))  # weight = 0.6
         
         # Ensemble predictions with weighted voting
         if len(all_predictions) > 0:
-            ensembled = self._ensemble_predictions(all_predictions)
-            return [ensembled]
+            fused = results[0].new()
+            fused.update(boxes=self._ensemble_predictions(all_predictions, view_weights))
+            return [fused]
         
         return []
     
     def _ensemble_predictions(
         self,
-        predictions: List[Tuple]
-    ):
+        predictions: List[Tuple],
+        view_weights: List[float]
+    ) -> torch.Tensor:
         """
         Ensemble multiple predictions using weighted NMS.
         
+        All augmented detections are concatenated and reduced with a single
+        class-aware NMS pass. Each surviving box takes the weighted mean
+        confidence over all views, counting views that missed it as zero, and
+        boxes that fall below the confidence threshold are voted out.
+        
         Args:
-            predictions: List of (result, weight) tuples
+            predictions: List of (xyxy, conf, cls, weight) tuples
+            view_weights: Weights of every augmented view, including views
+                without detections
             
         Returns:
-            Ensembled result
+            Fused detections as an (N, 6) tensor of [x1, y1, x2, y2, conf, cls]
         """
-        if len(predictions) == 0:
-            return None
-        
-        # Use weighted average approach
-        # For simplicity, return the prediction with highest average confidence
-        best_pred = max(
-            predictions,
-            key=lambda x: (x[0].boxes.conf.mean() * x[1])
+        boxes = torch.cat([p[0] for p in predictions])
+        conf = torch.cat([p[1] for p in predictions])
+        cls = torch.cat([p[2] for p in predictions])
+        weights = torch.cat([
+            torch.full_like(p[1], p[3]) for p in predictions
+        ])
+        
+        keep = torchvision.ops.batched_nms(
+            boxes, conf * weights, cls.long(), self.iou_threshold
         )
         
-        return best_pred[0]
+        # Assign every detection to the best-overlapping kept box of its class
+        iou = torchvision.ops.box_iou(boxes[keep], boxes)
+        iou[cls[keep][:, None] != cls[None, :]] = 0
+        cluster = iou.argmax(dim=0)
+        member = iou.gather(0, cluster[None]).squeeze(0) >= self.iou_threshold
+        member[keep] = True
+        
+        score_sum = torch.zeros(len(keep), dtype=conf.dtype, device=conf.device)
+        score_sum.scatter_add_(0, cluster[member], (conf * weights)[member])
+        
+        fused_conf = (score_sum / sum(view_weights)).clamp_(max=1.0)
+        fused = torch.cat(
+            [boxes[keep], fused_conf[:, None], cls[keep][:, None]], dim=1
+        )
+        return fused[fused_conf >= self.conf_threshold]
     
     def _parse_results(self, results) -> List[Dict]:
         """
@@ -0,0 +1,40 @@
+"""
+Parity check between the Numba box kernel and the cv2.rectangle fallback.
+"""
+
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("numba")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import predict  # noqa: E402
+
+
+def _draw_with_cv2(image, bboxes, colors):
+    for (x1, y1, x2, y2), color in zip(bboxes.tolist(), colors.tolist()):
+        cv2.rectangle(image, (x1, y1), (x2, y2), color, predict.BOX_THICKNESS)
+    return image
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_draw_boxes_matches_cv2_rectangle(seed):
+    rng = np.random.default_rng(seed)
+    height, width = 240, 320
+    n = int(rng.integers(1, 30))
+
+    # Overlapping boxes, some touching or crossing the image border
+    x = np.sort(rng.integers(-5, width + 5, size=(n, 2)), axis=1)
+    y = np.sort(rng.integers(-5, height + 5, size=(n, 2)), axis=1)
+    bboxes = np.stack([x[:, 0], y[:, 0], x[:, 1], y[:, 1]], axis=1).astype(np.int64)
+    colors = rng.integers(0, 256, size=(n, 3)).astype(np.uint8)
+    background = rng.integers(0, 256, size=(height, width, 3)).astype(np.uint8)
+
+    expected = _draw_with_cv2(background.copy(), bboxes, colors)
+    actual = background.copy()
+    predict.draw_boxes(actual, bboxes, colors)
+
+    np.testing.assert_array_equal(actual, expected)